@@ -0,0 +1,42 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+""" _sudoku_core.pyx : optional compiled helpers for sudoku.py,
+for use without Numba. Build with:  python setup.py build_ext --inplace
+"""
+cdef extern from *:
+    int __builtin_ctz(unsigned int x) nogil
+
+ctypedef fused cell_t:
+    signed char
+    int
+    long
+    long long
+
+def apply_placement(cell_t[::1] grid, unsigned int[::1] rmask, unsigned int[::1] cmask,
+                    unsigned int[::1] bmask, unsigned int[::1] pmask,
+                    Py_ssize_t[:, ::1] peers, Py_ssize_t c, int v, int m, int n):
+    "Put value v into cell c of the flat grid, update the masks and the candidates of the peers of c."
+    cdef Py_ssize_t N = m*n, i = c // N, j = c % N, k
+    cdef unsigned int bit = (<unsigned int> 1) << (v - 1)
+    grid[c] = v
+    rmask[i] |= bit ; cmask[j] |= bit ; bmask[i//m*m + j//n] |= bit
+    pmask[c] = 0
+    for k in range(peers.shape[1]):
+        pmask[peers[c, k]] &= ~bit
+
+def find_hidden_singles(unsigned int[::1] pmask, Py_ssize_t[::1] cells, int[::1] out):
+    """Set out[t] to the value which is possible only at cells[t] among all 'cells', or to 0.
+    Returns the number of hidden singles found."""
+    cdef unsigned int once = 0, more = 0, p, singles
+    cdef Py_ssize_t t
+    cdef int found = 0
+    for t in range(cells.shape[0]):
+        p = pmask[cells[t]]
+        more |= once & p ; once |= p
+    singles = once & ~more
+    for t in range(cells.shape[0]):
+        p = pmask[cells[t]] & singles
+        if p:
+            out[t] = __builtin_ctz(p) + 1 ; found += 1
+        else:
+            out[t] = 0
+    return found
@@ -0,0 +1,64 @@
+""" _sudoku_cuda.py : optional CUDA kernel (via numba.cuda) for sudoku.py.
+Applies constraint propagation (naked and hidden singles) to a batch of
+puzzles on the GPU, one block per puzzle and one thread per cell.
+"""
+import numpy as np
+from numba import cuda, int32, uint32
+
+MAX_CELLS = 1024    # at most 32 x 32 grids: one thread per cell, 32 bit masks
+
+@cuda.jit
+def _propagate_kernel(grids, m, n):
+    N = m*n ; NN = N*N ; ALL = (1 << N) - 1
+    b = cuda.blockIdx.x ; c = cuda.threadIdx.x
+    grid = cuda.shared.array(MAX_CELLS, int32)
+    cand = cuda.shared.array(MAX_CELLS, uint32)
+    masks = cuda.shared.array(96, uint32)     # rows, columns, boxes
+    flag = cuda.shared.array(1, int32)
+    if c < NN: grid[c] = grids[b, c]
+    i = c // N ; j = c % N
+    while True:
+        if c == 0: flag[0] = 0
+        cuda.syncthreads()
+        if c < N:    # thread c collects the digits placed in row, col. and box c
+            r = 0 ; s = 0 ; t = 0
+            for k in range(N):
+                if grid[c*N + k]: r |= 1 << (grid[c*N + k] - 1)
+                if grid[k*N + c]: s |= 1 << (grid[k*N + c] - 1)
+                x = (c//m*m + k//n)*N + c%m*n + k%n
+                if grid[x]: t |= 1 << (grid[x] - 1)
+            masks[c] = r ; masks[32 + c] = s ; masks[64 + c] = t
+        cuda.syncthreads()
+        if c < NN:
+            cand[c] = 0 if grid[c] else ALL & ~(masks[i] | masks[32 + j]
+                                                | masks[64 + i//m*m + j//n])
+        cuda.syncthreads()
+        if c < NN and cand[c]:
+            p = cand[c] ; v = p if cuda.popc(p) == 1 else 0
+            for kind in range(3):
+                if v: break
+                others = 0
+                for k in range(N):
+                    if kind == 0: x = i*N + k
+                    elif kind == 1: x = k*N + j
+                    else: x = (i//m*m + k//n)*N + j//n*n + k%n
+                    if x != c: others |= cand[x]
+                v = p & ~others
+            if v:
+                grid[c] = cuda.ffs(v) ; flag[0] = 1
+        cuda.syncthreads()
+        changed = flag[0]
+        cuda.syncthreads()
+        if not changed: break
+    if c < NN: grids[b, c] = grid[c]
+
+def propagate_many(grids, m, n):
+    """Fill in naked and hidden singles of each of the flattened grids[b]
+    (a B x N*N array, modified in place) on the GPU, until none is left."""
+    d_grids = cuda.to_device(grids)
+    _propagate_kernel[len(grids), m*n*m*n](d_grids, m, n)
+    d_grids.copy_to_host(grids)
+
+def is_available():
+    "Whether a CUDA GPU can be used."
+    return cuda.is_available()
@@ -0,0 +1,9 @@
+""" setup.py : builds the optional compiled helpers used by sudoku.py:
+    python setup.py build_ext --inplace
+"""
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+setup(ext_modules=cythonize(
+    [Extension("_sudoku_core", ["_sudoku_core.pyx"],
+               extra_compile_args=["-O3", "-march=native"])]))
@@ -1,6 +1,176 @@
 """ sudoku.py
+Speed-ups are optional: with Numba, solve() runs compiled; otherwise set() and
+hidden_singles_in() use the Cython helpers from _sudoku_core.pyx when they have
+been built (python setup.py build_ext --inplace). Sudoku.solve_many(..., gpu=True)
+uses a CUDA GPU through numba.cuda (_sudoku_cuda.py) when one is available.
 """
-from numpy import array, zeros
+import numpy as np
+from numpy import array, zeros, uint32
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is optional: without it, the "compiled" functions run as plain Python.
+    def njit(*args, **kwargs):
+        return args[0] if args and callable(args[0]) else lambda f: f
+    prange = range
+try:
+    from _sudoku_core import apply_placement, find_hidden_singles
+except ImportError:
+    apply_placement = find_hidden_singles = None
+
+def digits(mask):
+    "Set of the digits whose bits are set in the candidate bitmask 'mask'."
+    S = set()
+    while mask:
+        S.add((mask & -mask).bit_length()); mask &= mask - 1
+    return S
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _trailing_zeros(bit):
+    "Index of the lowest set bit of 'bit' (which must be > 0)."
+    k = 0
+    while not bit & 1:
+        bit >>= 1 ; k += 1
+    return k
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _hidden_singles(masks):
+    "Bitmask of the digits that are set in exactly one of the given candidate masks."
+    once = more = 0    # digits possible in at least one / two cells
+    for p in masks:
+        more |= once & p ; once |= p
+    return once & ~more
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _candidates(grid, rmask, cmask, bmask, c, m, n):
+    "Bitmask of the values that can be placed in cell c of the flattened grid."
+    if grid[c]: return 0
+    N = m*n ; i, j = c // N, c % N
+    return ~int(rmask[i] | cmask[j] | bmask[i//m*m + j//n]) & ((1 << N) - 1)
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _popcount(mask):
+    "Number of bits set in 'mask'."
+    k = 0
+    while mask:
+        mask &= mask - 1 ; k += 1
+    return k
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _place(grid, rmask, cmask, bmask, c, bit, m, n):
+    "Put the digit given by 'bit' into the (empty) cell c, or remove it when c holds it."
+    N = m*n ; i, j = c // N, c % N
+    grid[c] = 0 if grid[c] else _trailing_zeros(bit) + 1
+    rmask[i] ^= bit ; cmask[j] ^= bit ; bmask[i//m*m + j//n] ^= bit
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _make_masks(grid, rmask, cmask, bmask, m, n):
+    """Set rmask, cmask, bmask to the digits placed in each row, col. and box
+    of the flattened grid. Returns False if a digit is repeated in one of them."""
+    N = m*n ; ok = True
+    rmask[:] = 0 ; cmask[:] = 0 ; bmask[:] = 0
+    for c in range(N*N):
+        if not grid[c]: continue
+        i, j = c // N, c % N ; bit = 1 << (int(grid[c]) - 1)
+        if (rmask[i] | cmask[j] | bmask[i//m*m + j//n]) & bit:
+            ok = False    # the same digit twice in a row, col. or box
+        rmask[i] |= bit ; cmask[j] |= bit ; bmask[i//m*m + j//n] |= bit
+    return ok
+
+@njit(cache=True, boundscheck=False, nogil=True, inline='always')
+def _propagate(grid, rmask, cmask, bmask, m, n, trail, top, cells, masks):
+    """Fill in hidden singles until none is left, pushing the filled cells on
+    trail[top:]. cells, masks are work arrays of size N for one group.
+    Returns the new top and False if a contradiction was found."""
+    N = m*n ; ALL = (1 << N) - 1
+    change = True
+    while change:
+        change = False
+        for kind in range(3):   # rows, columns, boxes
+            for k in range(N):
+                for t in range(N):
+                    if kind == 0: cells[t] = k*N + t
+                    elif kind == 1: cells[t] = t*N + k
+                    else: cells[t] = (k//m*m + t//n)*N + k%m*n + t%n
+                    masks[t] = _candidates(grid, rmask, cmask, bmask, cells[t], m, n)
+                placed = rmask[k] if kind == 0 else cmask[k] if kind == 1 else bmask[k]
+                once = 0
+                for t in range(N): once |= masks[t]
+                if (once | int(placed)) != ALL:
+                    return top, False   # some digit can't go anywhere in this group
+                singles = _hidden_singles(masks)
+                for t in range(N):
+                    p = masks[t] & singles
+                    if not p: continue
+                    c = cells[t]
+                    if p & (p-1) or not _candidates(grid, rmask, cmask, bmask, c, m, n) & p:
+                        return top, False
+                    _place(grid, rmask, cmask, bmask, c, p, m, n)
+                    trail[top] = c ; top += 1 ; change = True
+    return top, True
+
+@njit(cache=True, boundscheck=False, nogil=True, inline='always')
+def _solve_core(grid, rmask, cmask, bmask, m, n):
+    """Solve the flattened N x N 'grid' by propagation of hidden singles and
+    backtracking on the empty cell with the fewest candidates (MRV).
+    rmask, cmask, bmask are set to the digits placed in each row, col. and box
+    and kept up to date. Returns True if a solution was found, otherwise
+    False and the grid is left unchanged, also at once for repeated clues."""
+    N = m*n
+    if not _make_masks(grid, rmask, cmask, bmask, m, n): return False
+    trail = np.empty(N*N, np.int64)    # the cells filled so far, in order
+    # for each level of the search: trail position, cell and untried candidates
+    saved = np.empty(N*N, np.int64) ; cell = np.empty(N*N, np.int64)
+    rest = np.empty(N*N, np.int64)
+    cells = np.empty(N, np.int64) ; masks = np.empty(N, np.int64)    # for _propagate
+    top, ok = _propagate(grid, rmask, cmask, bmask, m, n, trail, 0, cells, masks)
+    depth = 0
+    while True:
+        if ok:
+            c = -1 ; best = N + 1 ; cands = 0
+            # The flat int8 grid is only a few cache lines, so scanning it for the
+            # empty cells is cheaper than keeping a bitmap of them through every
+            # placement and undo (81 cells would already need two words).
+            for k in range(N*N):
+                if grid[k]: continue
+                p = _candidates(grid, rmask, cmask, bmask, k, m, n)
+                count = _popcount(p)
+                if count < best:
+                    c, best, cands = k, count, p
+                    if count <= 1: break
+            if c < 0: return True
+            saved[depth] = top ; cell[depth] = c ; rest[depth] = cands ; depth += 1
+        while depth and not rest[depth-1]:
+            depth -= 1
+        # undo everything since the last guess (or everything, if we're done)
+        target = saved[depth-1] if depth else 0
+        while top > target:
+            top -= 1 ; c = trail[top]
+            _place(grid, rmask, cmask, bmask, c, 1 << int(grid[c])-1, m, n)
+        if not depth: return False
+        p = rest[depth-1] ; bit = p & -p ; rest[depth-1] = p ^ bit
+        _place(grid, rmask, cmask, bmask, cell[depth-1], bit, m, n)
+        trail[top] = cell[depth-1] ; top += 1
+        top, ok = _propagate(grid, rmask, cmask, bmask, m, n, trail, top, cells, masks)
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _solve_core_9x9(grid, rmask, cmask, bmask):
+    """_solve_core() for the standard 9 x 9 grid. The generic code is inlined here
+    with m = n = 3, so the compiler sees N = 9 as a constant and can unroll the loops."""
+    return _solve_core(grid, rmask, cmask, bmask, 3, 3)
+
+@njit(cache=True, parallel=True, nogil=True)
+def _solve_many_core(grids, m, n):
+    """Solve each of the flattened grids[b] in place, in parallel.
+    Returns the array of flags solved[b], False for the puzzles without solution."""
+    N = m*n ; solved = np.zeros(grids.shape[0], np.bool_)
+    for b in prange(grids.shape[0]):
+        grid = grids[b]    # _solve_core() computes the masks and checks the clues
+        rmask = np.empty(N, np.uint32) ; cmask = np.empty(N, np.uint32)
+        bmask = np.empty(N, np.uint32)
+        if m == 3 and n == 3: solved[b] = _solve_core_9x9(grid, rmask, cmask, bmask)
+        else: solved[b] = _solve_core(grid, rmask, cmask, bmask, m, n)
+    return solved
 
 class Sudoku:
     """A class for sudoku grids: create, modify, solve, compute information...
@@ -9,23 +179,40 @@ class Sudoku:
     m: int = 3 : height of a rectangular block. Can also be given as first integer positional arg.
     n: int = m : width of a rectangular block. Can also be given as second integer positional arg.
         The entire sudoku grid is a matrix of n x m rectangular blocks (a.k.a. regions) of size m x n.
-    grid: object = zeros((m*n, m*n), int) : a 2D numpy ndarray with N x N integer elements in [0, ..., N].
+    grid: object = zeros((m*n, m*n), int8) : a 2D numpy ndarray with N x N int8 elements in [0, ..., N].
         Can also be given as string or (possibly nested) list or 1D array with N*N elements,
         which, if 1D, is then reformatted to a 2D array of size N x N.
-    N: int = m*n : computed from given m, n or grid. Must not be a prime number.
+    verbose: bool = False : whether to print progress information, e.g., the cells filled by solve().
+    N: int = m*n : computed from given m, n or grid. Must not be a prime number, and
+        must be at most 32, since the candidates of a cell are stored as a 32 bit mask.
         If m is not given, it will be taken to be the least divisor >= sqrt(N), and n = N/m.
         (For example, if  N = 9, then  m = n = 3; if  N = 6, then  m = 3, n = 2.)
-    indices: set = { 0, ..., N-1 } : for convenience.
-    entries: set = { 1, ..., N } : for convenience.
-    poss: dict = { (i,j): Sij ; i,j in indices }, where Sij = set of possible entries for cell (i,j)
+    indices: frozenset = { 0, ..., N-1 } : for convenience.
+    entries: frozenset = { 1, ..., N } : for convenience, = digits(ALL).
+    ALL: int = 2**N - 1 : bitmask with all N digits. Bit k of a mask stands for digit k+1.
+    row_mask, col_mask, box_mask: array = N masks (uint32) of the digits placed in each row, col. or box.
+    pmask: array = N*N masks (uint32) of possible entries, indexed by the flat cell index i*N+j.
+    box_of: array = N x N array of the index box(i,j) of the region of each cell.
+    row_cells, col_cells, box_cells: array = N x N arrays, where row_cells[k] holds the
+        flat indices i*N+j of the cells of row k, and similarly for columns and boxes.
+    peers: array = N*N x P array, where peers[c] holds the flat indices of the P = 2(N-1)+(m-1)(n-1)
+        other cells in the same row, col. or box as cell c.
 *Methods:*
     all(): generator = (i,j) for i in indices for j in indices : all indices of the grid
-    row(i): generator = (i,j) for j in indices : all indices of row i
-    col(j): generator = (i,j) for i in indices : all indices of col. j
-    possible(i,j): set = { possible values v that can be inserted at position (i,j) } ( = set() if grid[i,j] > 0).
-    only(region: iterable): iterable = ( ((i,j), v) such that (i,j) is 
-        the *only* (i,j) in region such that v is in possible(i,j) )
-sible value that can be at (i,j)
+    row(i): list = [(i,j) for j in indices] : all indices of row i
+    col(j): list = [(i,j) for i in indices] : all indices of col. j
+    region(i,j): list = all indices (x,y) of the region containing (i,j)
+    box(i,j): int = index of the region containing (i,j), numbered row-wise from 0 to N-1.
+    possible(i,j): int = bitmask of possible values v that can be inserted at position (i,j) ( = 0 if grid[i,j] > 0).
+        Use digits(mask) to get the corresponding set of values.
+    only_in_range(rng): dict = { (i,j): v } such that (i,j) is the *only* (i,j)
+        in rng (an iterable of indices (x,y)) such that v is in possible(i,j).
+    hidden_singles_in(cells): list = [ (c, v) ], the same for a list of flat indices c.
+    find_only(): generator = ( ((i,j), v) ) as above, for all rows, then cols., then boxes.
+    solve(): bool = fill the grid by propagation of hidden singles and backtracking,
+        return False if there is no solution.
+    solve_many(grids, gpu=False): array = solutions of a batch of puzzles, solved in parallel
+        (class method). Propagation can run on a CUDA GPU, see _sudoku_cuda.py.
     
     """
     default = {'m': 3}
@@ -43,30 +230,28 @@ sible value that can be at (i,j)
                                       GGG HHH JJJ
         b) A list of lists (or 2D numpy array or matrix) which will hold
            the grid.
+        The keyword argument verbose = True makes the methods report what they do.
         """
-        # first check positional args
-        for i,arg in enumerate(args):
-            # if there are integers, these are 'm' and then 'n',
-            # and those must not be given as kwargs.
-            if isinstance(arg, int):
-                if 'm' not in kwargs:
-                    kwargs['m'] = arg
-                elif i == 0:
-                    raise ValueError("Parameter m specified twice, as "
-                                     "positional and as keyword argument!")
-                elif 'n' not in kwargs:
-                    kwargs['n'] = arg
-                else:
-                    raise ValueError("Too many integer parameters: found "
-                                     f"argument '{arg}' in addition to "
-                                     f"m = {kwargs['m']} and n = {kwargs['n']}.")
-                
-            # otherwise, if positional arg is not an integer,
-            # it must be the 'grid', and that must not be given as kwarg:
-            elif 'grid' not in kwargs:
-                kwargs['grid'] = arg
-            else:
-                raise ValueError(f"Unrecognized positional argument '{arg}'.")
+        self.verbose = kwargs.pop('verbose', False)
+        # first check positional args: integers are 'm' and then 'n', another
+        # argument must be the 'grid'. Those must not also be given as kwargs.
+        ints = [arg for arg in args if isinstance(arg, int)]
+        others = [arg for arg in args if not isinstance(arg, int)]
+        if len(ints) > 2:
+            raise ValueError(f"Too many integer parameters: got {ints}, "
+                             "expected at most m and n.")
+        if len(others) > 1:
+            raise ValueError(f"Unrecognized positional argument '{others[1]}'.")
+        for param, arg in zip('mn', ints):
+            if param in kwargs:
+                raise ValueError(f"Parameter {param} specified twice, as "
+                                 "positional and as keyword argument!")
+            kwargs[param] = arg
+        if others:
+            if 'grid' in kwargs:
+                raise ValueError("Parameter grid specified twice, as "
+                                 "positional and as keyword argument!")
+            kwargs['grid'] = others[0]
 
         # if the shape is given, we may need that to resize the 'grid'
         # argument conveniently. So let's complete 'n' if m was given.
@@ -85,12 +270,11 @@ sible value that can be at (i,j)
 
         if 'grid' in kwargs:
             # it must be possible to cast it into an array.
-            try: grid = array( kwargs['grid'], dtype = int )
+            try: grid = array( kwargs['grid'], dtype = np.int8 )
             except:
                 raise ValueError("Parameter 'grid' must be an object suitable"
-                                 " for numpy.array() with dtype = int.")
+                                 " for numpy.array() with dtype = int8.")
             N = grid.ndim
-            print(f"ndim = {N}")
             if N == 2:
                 n, N = grid.shape
                 if n != N:
@@ -113,24 +297,35 @@ sible value that can be at (i,j)
                                      " the given grid's size!")
             else:
                 # N = m*n was not given, only the grid. Guess m,n.
-                n = round(N**.5)
-                if n*n > N: n-=1
-                while n > 1 and N % n: n-=1
-                if n <= 1:
+                # n = the largest divisor 1 < n <= sqrt(N)
+                divisors = np.arange(2, int(N**.5) + 1)
+                if not (divisors := divisors[N % divisors == 0]).size:
                     raise ValueError(
                         f"The size {N} of the given grid can't be written as m*n!")
-                print(f"Guessing that the size of the regions is {(N//n,n)}.")
+                n = int(divisors[-1])
+                if self.verbose:
+                    print(f"Guessing that the size of the regions is {(N//n,n)}.")
                 self.N, self.m, self.n = N, N // n, n
 
             self.grid = grid
             
         #else: grid not given
         elif 'm' in kwargs:
-            self.grid = zeros((self.N, self.N), dtype=int)
+            self.grid = zeros((self.N, self.N), dtype=np.int8)
 
         else:
             raise ValueError("Either the size or the grid must be given.")
-        
+
+        if self.N > 32:
+            raise ValueError(f"The size N = {self.N} is too large: at most 32 digits"
+                             " fit into the uint32 masks.")
+        self.ALL = (1 << self.N) - 1
+        self.indices = frozenset(range(self.N))
+        self.entries = frozenset(range(1, self.N+1))
+        self.make_index_arrays()
+        self.make_masks()
+        self.make_poss_dict()
+
     def __str__(self):
         return f"Sudoku grid of size {self.N} x {self.N} (m,n = "+\
                 f"{self.m},{self.n}):\n"+str(self.grid)
@@ -138,74 +333,145 @@ sible value that can be at (i,j)
     def __repr__(self):
         return f"Sudoku(m={self.m}, n={self.n}, grid=\n"+repr(self.grid)+")"
 
+    def __setitem__(self, ij, value):
+        "S[i,j] = value: same as S.set(i, j, value)."
+        self.set(*ij, value)
+
+    def make_masks(self):
+        "Compute the masks of the digits already placed in each row, col. and box."
+        bits = (self.grid > 0).astype(uint32) << (self.grid - 1).clip(0).astype(uint32)
+        self.row_mask = np.bitwise_or.reduce(bits, axis=1)
+        self.col_mask = np.bitwise_or.reduce(bits, axis=0)
+        # axes of the reshaped grid: (block row, row in block, block col, col in block)
+        self.box_mask = np.bitwise_or.reduce(bits.reshape(self.n, self.m, self.m, self.n),
+                                             axis=(1,3)).reshape(-1)
+
+    def make_index_arrays(self):
+        "Precompute the box index of each cell and the flat indices of the cells of each row, col. and box."
+        I, J = np.indices((self.N, self.N))
+        self.box_of = I//self.m * self.m + J//self.n
+        self.row_cells = np.arange(self.N**2).reshape(self.N, self.N)
+        self.col_cells = self.row_cells.T.copy()
+        self.box_cells = self.box_of.argsort(axis=None, kind='stable').reshape(self.N, self.N)
+        # the other cells in the same row, col. or box, e.g., 20 "peers" for 9 x 9.
+        self.peers = array([ sorted({*self.row_cells[c // self.N].tolist(),
+                                     *self.col_cells[c % self.N].tolist(),
+                                     *self.box_cells[self.box_of.flat[c]].tolist()} - {c})
+                             for c in range(self.N**2) ], dtype=np.intp)
+
     def possible(self, i, j):
-        "Return list of numbers that can be placed at (i,j)."
-        if self.grid[i,j]: return set()
-        S = set(range(1,self.N+1))
-        S -= set(self.grid[i,:]) ; S -= set(self.grid[:,j])
-        S -= set(self.grid[x,y] for x,y in self.region(i,j))
-        return S
-    
+        "Return bitmask of numbers that can be placed at (i,j)."
+        return int(self.pmask[i*self.N + j])
+
+    def box(self, i, j):
+        "Index of the region containing (i,j)."
+        return int(self.box_of[i,j])
+
+    def positions(self, cells):
+        "List of the (x,y) corresponding to the given flat cell indices."
+        return [divmod(c, self.N) for c in cells.tolist()]
+
     def region(self, i, j):
-        "Generator of all (x,y) in the same region as (i,j)."
-        i,j = i//self.m * self.m, j//self.n * self.n
-        return((x,y) for x in range(i, i + self.m)
-                     for y in range(j, j + self.n))
-    def row(self, i): return ((i,j) for j in range(self.N))
-    def col(self, j): return ((i,j) for i in range(self.N))
+        "List of all (x,y) in the same region as (i,j)."
+        return self.positions(self.box_cells[self.box_of[i,j]])
+    def row(self, i): return self.positions(self.row_cells[i])
+    def col(self, j): return self.positions(self.col_cells[j])
     
     def all(self):
         "Generator of all indices (x,y)."
         return((x,y) for x in range(self.N) for y in range(self.N))
     def make_poss_dict(self, fill=True):
-        "Make dict of possible fill's for each cell (x,y)."
-        self.poss = {ij:self.possible(*ij)for ij in self.all()}
+        "Make array 'pmask' of the masks of possible fill's for each cell, from the row, col. and box masks."
+        # one broadcast over the N x N grid instead of a loop over the cells
+        taken = self.row_mask[:,None] | self.col_mask[None,:] | self.box_mask[self.box_of]
+        self.pmask = np.where(self.grid == 0, ~taken & uint32(self.ALL), 0).astype(uint32).reshape(-1)
     def set(self, i, j, value):
-        "Set cell i,j to value, update dict 'possible'."
+        "Set cell i,j to value, update the row, col. and box masks and 'pmask'."
         assert self.grid[i,j]==0
-        self.grid[i,j] = value ; self.poss[i,j]=set()
-        for x in range(self.N):
-            self.poss[i,x].discard(value)
-            self.poss[x,j].discard(value)
-        for ij in self.region(i,j):
-            self.poss[ij].discard(value)
+        c = i*self.N + j
+        if apply_placement:
+            return apply_placement(self.grid.reshape(-1), self.row_mask, self.col_mask,
+                                   self.box_mask, self.pmask, self.peers, c, value,
+                                   self.m, self.n)
+        bit = 1 << value-1
+        self.grid[i,j] = value
+        self.row_mask[i] |= bit ; self.col_mask[j] |= bit
+        self.box_mask[self.box_of[i,j]] |= bit
+        self.pmask[c] = 0 ; self.pmask[self.peers[c]] &= self.ALL ^ bit
+    def hidden_singles_in(self, cells):
+        "List of (c, v) such that v is possible only at cell c among the given flat cell indices."
+        cells = np.asarray(cells, dtype=np.intp)    # no copy for row_cells[k] etc.
+        if find_hidden_singles:
+            out = zeros(len(cells), dtype=np.int32)
+            if not find_hidden_singles(self.pmask, cells, out): return []
+            found = out.nonzero()[0]
+            return list(zip(cells[found].tolist(), out[found].tolist()))
+        masks = self.pmask[cells].astype(np.int64)
+        if not (singles := int(_hidden_singles(masks))): return []
+        found = (masks & singles).nonzero()[0]
+        return [ (c, (b & -b).bit_length()) for c,b in
+                 zip(cells[found].tolist(), (masks[found] & singles).tolist()) ]
+
     def only_in_range(self, rng):
-        if not getattr(self,'poss',0): self.make_poss_dict()
-        found={}
-        for xy in rng:
-            for val in (p := self.poss[xy]):
-                found[val] = 0 if val in found else xy
-        return { found[val]: val for val in found if found[val] }
+        "Return { (x,y): v } for all v that are possible at only one (x,y) in rng."
+        return { divmod(c, self.N): v for c,v in
+                 self.hidden_singles_in([x*self.N + y for x,y in rng]) }
 
     def find_only(self):
-        for k in range(self.N):
-            for rng in (self.row(k), self.col(k), self.region(k,k%self.m*self.n)):
-                for xy in self.only_in_range(rng).items(): yield xy
+        "Generator of ((i,j), v) such that v is possible only at (i,j) in a row, col. or box."
+        for group_cells in (self.row_cells, self.col_cells, self.box_cells):
+            for k in range(self.N):
+                for c,v in self.hidden_singles_in(group_cells[k]):
+                    yield divmod(c, self.N), v
 
     def solve(self):
-        change = 1
-        while change:
-            change = 0
-            for xy,z in self.find_only():
-                print(end = f"{xy}={z}, "); self.set(*xy,z)
-                change=1
-                
-S = Sudoku([[0,0,0, 4,0,0, 2,9,0],
-            [7,0,2, 0,5,0, 0,8,0],
-            [0,4,0, 0,0,0, 0,0,0],
-            [1,0,0, 2,0,0, 5,0,0],
-            [0,5,0, 8,0,3, 0,1,0],
-            [0,0,7, 0,0,4, 0,0,3],
-            [0,0,0, 0,0,0, 0,7,0],
-            [0,7,0, 0,4,0, 1,0,6],
-            [0,3,9, 0,0,6, 0,0,0]])
-
-if 1:
-    found = 1
-    while found:
-        found = 0
-        for i in range(9):
-            for j in range(9):
-                if not S.grid[i,j] and len(R := S.possible(i,j))==1:
-                    S[i,j] = found = min(R)
-                    print(end = f"{ (i,j) } = { found }, ")
+        "Solve the sudoku. Returns True on success, or False (and leaves the grid unchanged) if it has no solution."
+        empty = self.grid == 0
+        if self.m == self.n == 3:
+            solved = _solve_core_9x9(self.grid.reshape(-1), self.row_mask,
+                                     self.col_mask, self.box_mask)
+        else:
+            solved = _solve_core(self.grid.reshape(-1), self.row_mask, self.col_mask,
+                                 self.box_mask, self.m, self.n)
+        self.make_poss_dict()
+        if self.verbose:
+            for xy in zip(*(empty & (self.grid > 0)).nonzero()):
+                print(end = f"{tuple(map(int,xy))}={self.grid[xy]}, ")
+        return solved
+
+    @classmethod
+    def solve_many(cls, grids, *args, gpu=False, **kwargs):
+        """Solve a batch of puzzles in parallel (on all cores when Numba is available).
+        grids: B x N x N array (or anything that can be cast to one, also B x N*N).
+        With gpu = True, propagation is first done on a CUDA GPU if there is one,
+        and only the puzzles that need guessing are then finished on the CPU.
+        Other arguments are as for Sudoku(), e.g., m and n.
+        Returns the B x N x N array of solutions; a puzzle without solution is returned unchanged."""
+        S = cls(grids[0], *args, **kwargs)    # checks and determines m, n
+        grids = array(grids, dtype=S.grid.dtype).reshape(len(grids), S.N**2)
+        if gpu:
+            try: import _sudoku_cuda    # only imported here: it loads numba.cuda
+            except ImportError: gpu = False
+        if gpu and _sudoku_cuda.is_available():
+            original = grids.copy()
+            _sudoku_cuda.propagate_many(grids, S.m, S.n)
+            solved = _solve_many_core(grids, S.m, S.n)
+            # conflicting placements on the GPU only happen if there is no solution,
+            # and such a grid may even be full: restore all puzzles that weren't solved
+            grids[~solved] = original[~solved]
+        else:
+            _solve_many_core(grids, S.m, S.n)
+        return grids.reshape(-1, S.N, S.N)
+
+if __name__ == "__main__":
+    S = Sudoku([[0,0,0, 4,0,0, 2,9,0],
+                [7,0,2, 0,5,0, 0,8,0],
+                [0,4,0, 0,0,0, 0,0,0],
+                [1,0,0, 2,0,0, 5,0,0],
+                [0,5,0, 8,0,3, 0,1,0],
+                [0,0,7, 0,0,4, 0,0,3],
+                [0,0,0, 0,0,0, 0,7,0],
+                [0,7,0, 0,4,0, 1,0,6],
+                [0,3,9, 0,0,6, 0,0,0]], verbose=True)
+    S.solve()
+    print() ; print(S)
@@ -0,0 +1,221 @@
+""" test_sudoku.py : tests for sudoku.py, run with  python -m pytest
+"""
+import os, subprocess, sys
+
+import numpy as np
+import pytest
+
+from sudoku import Sudoku, digits, _solve_core, _solve_core_9x9
+
+HARD = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+EASY = "000400290702050080040000000100200500050803010007004003000000070070040106039006000"
+
+def grid_of(puzzle):
+    return [int(c) for c in puzzle]
+
+def is_solution(S, puzzle):
+    "Whether S.grid is a complete valid grid that agrees with the clues of 'puzzle'."
+    G = S.grid ; clues = np.array(puzzle).reshape(S.N, S.N)
+    if not (G > 0).all() or ((clues > 0) & (clues != G)).any(): return False
+    return all(len(set(G.flat[cells].tolist())) == S.N
+               for cells in (*S.row_cells, *S.col_cells, *S.box_cells))
+
+def test_digits():
+    assert digits(0) == set() and digits(0b101) == {1, 3} and digits(0x1FF) == set(range(1,10))
+
+def test_possible_and_set():
+    S = Sudoku(grid_of(EASY))
+    assert digits(S.possible(0,0)) == {3, 5, 6, 8} and S.possible(0,3) == 0
+    S.set(0,0,5)
+    assert S.possible(0,0) == 0 and S.row_mask[0] & 1 << 4
+    assert 5 not in digits(S.possible(0,1)) | digits(S.possible(8,0)) | digits(S.possible(2,2))
+
+def test_only_in_range():
+    S = Sudoku(grid_of(EASY))
+    assert S.only_in_range(S.row(3)) == {(3,2): 3}
+    assert S.only_in_range(S.row(0)) == {}
+
+@pytest.mark.parametrize('puzzle', [EASY, HARD])
+def test_solve(puzzle):
+    S = Sudoku(grid_of(puzzle))
+    assert S.solve() and is_solution(S, grid_of(puzzle))
+    assert not S.pmask.any()
+    row_mask = S.row_mask.copy() ; S.make_masks()
+    assert (S.row_mask == row_mask).all()
+
+def test_solve_unsolvable_leaves_grid_unchanged():
+    # no clue repeats, but cell (0,0) can't hold any value
+    puzzle = [0] * 81 ; puzzle[1:9] = range(1,9) ; puzzle[5*9] = 9
+    S = Sudoku(puzzle) ; before = S.grid.copy()
+    assert not S.solve()
+    assert (S.grid == before).all()
+
+def test_solve_repeated_clue():
+    puzzle = grid_of(EASY) ; puzzle[0] = 9    # 9 is already in row 0
+    S = Sudoku(puzzle) ; before = S.grid.copy()
+    assert not S.solve() and (S.grid == before).all()
+    puzzle = np.zeros((16,16), int) ; puzzle[0,0] = puzzle[0,1] = 1    # used to search for minutes
+    S = Sudoku(puzzle)
+    assert not S.solve() and (S.grid == puzzle).all()
+    assert (Sudoku.solve_many([puzzle]) == puzzle).all()
+
+@pytest.mark.parametrize('mn', [(2,), (2,3), (3,2), (2,4), (4,)])
+def test_solve_sizes(mn):
+    S = Sudoku(*mn)
+    assert S.solve() and is_solution(S, [0] * S.N**2)
+
+def test_without_numba():
+    # run in a fresh interpreter where numba can't be imported
+    code = ("import sys ; sys.modules['numba'] = None\n"
+            "import sudoku\n"
+            "assert not hasattr(sudoku._solve_core, 'py_func')\n"
+            f"S = sudoku.Sudoku([int(c) for c in '{HARD}'])\n"
+            "assert S.solve() and (S.grid > 0).all()\n"
+            "assert sudoku.prange is range\n"
+            "assert (sudoku.Sudoku.solve_many([S.grid]) == S.grid).all()\n")
+    subprocess.run([sys.executable, '-c', code], check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+
+def test_make_masks():
+    S = Sudoku(2,3)
+    S.grid[4,5] = 6 ; S.grid[1,1] = 2 ; S.make_masks()
+    assert S.row_mask.tolist() == [0, 2, 0, 0, 32, 0]
+    assert S.col_mask.tolist() == [0, 2, 0, 0, 0, 32]
+    assert S.box_mask.tolist() == [2, 0, 0, 0, 0, 32]
+
+def test_index_arrays():
+    S = Sudoku(2,3)    # 3 x 2 blocks of 2 rows and 3 columns
+    assert S.box_of[4,5] == S.box(4,5) == 5 and S.box(1,2) == 0
+    assert S.box_cells[1].tolist() == [3, 4, 5, 9, 10, 11]
+    assert S.col_cells[2].tolist() == [2, 8, 14, 20, 26, 32]
+    assert S.region(3,4) == [(2,3), (2,4), (2,5), (3,3), (3,4), (3,5)]
+    assert S.row(1) == [(1,j) for j in range(6)]
+
+def test_hidden_singles():
+    S = Sudoku(grid_of(EASY))
+    assert S.hidden_singles_in(S.row_cells[3]) == [(29, 3)]
+    assert S.hidden_singles_in(S.row_cells[0]) == []
+    assert list(S.find_only()) == [((3,2), 3), ((5,3), 5), ((3,2), 3), ((5,3), 5)]
+
+def test_verbose(capsys):
+    Sudoku(grid_of(EASY)).solve()
+    assert capsys.readouterr().out == ""
+    Sudoku(grid_of(EASY), verbose=True).solve()
+    out = capsys.readouterr().out
+    assert "regions is (3, 3)" in out and "(3, 2)=3, " in out
+
+def test_indices_and_entries():
+    S = Sudoku(2,3)
+    assert S.indices == frozenset(range(6)) and S.entries == frozenset(range(1,7))
+    assert digits(S.ALL) == S.entries
+    assert S.row(0) == [(0,j) for j in S.indices]
+
+def test_setitem():
+    S = Sudoku(3)
+    S[0,0] = 5
+    assert S.grid[0,0] == 5 and S.row_mask[0] == S.col_mask[0] == S.box_mask[0] == 1 << 4
+    assert 5 not in digits(S.possible(0,1))
+
+def test_set_updates_pmask():
+    S = Sudoku(grid_of(EASY))
+    S[3,2] = 3 ; S.set(5,3,5)
+    pmask = S.pmask.copy() ; S.make_poss_dict()
+    assert (S.pmask == pmask).all()
+    assert all(S.pmask[i*9+j] == S.possible(i,j) for i,j in S.all())
+
+def test_peers():
+    assert Sudoku(3).peers.shape == (81, 20) and Sudoku(2,3).peers.shape == (36, 12)
+    assert Sudoku(3).peers[0].tolist() == [1,2,3,4,5,6,7,8, 9,10,11, 18,19,20, 27,36,45,54,63,72]
+    S = Sudoku(1)    # a single cell has no peers, but still an index array
+    assert S.peers.dtype == np.intp and S.peers.shape == (1, 0)
+    S.set(0, 0, 1) ; assert S.grid[0,0] == 1 and S.pmask[0] == 0
+
+def test_cython_helpers():
+    core = pytest.importorskip('_sudoku_core')    # built by: python setup.py build_ext --inplace
+    S = Sudoku(grid_of(EASY))
+    out = np.zeros(9, dtype=np.int32)
+    assert core.find_hidden_singles(S.pmask, S.row_cells[3].astype(np.intp), out) == 1
+    assert out.tolist() == [0, 0, 3, 0, 0, 0, 0, 0, 0]
+    T = Sudoku(grid_of(EASY))
+    core.apply_placement(T.grid.reshape(-1), T.row_mask, T.col_mask, T.box_mask, T.pmask,
+                         T.peers, 29, 3, 3, 3)
+    assert T.grid[3,2] == 3 and T.row_mask[3] & 1 << 2
+    pmask = T.pmask.copy() ; T.make_poss_dict()
+    assert (T.pmask == pmask).all()
+
+def test_possible_reads_pmask():
+    S = Sudoku(3)
+    assert not hasattr(S, 'poss') and S.pmask.shape == (81,)
+    S.pmask[4] = 0b11
+    assert S.possible(0,4) == 3
+
+@pytest.mark.parametrize('args, kwargs, mn', [
+    ((3,), {}, (3,3)), ((2,3), {}, (2,3)), ((3,), {'n': 2}, (3,2)),
+    (([0]*36, 2, 3), {}, (2,3)), ((), {'m': 2, 'n': 3}, (2,3)), ((), {'grid': [0]*16}, (2,2))])
+def test_init(args, kwargs, mn):
+    S = Sudoku(*args, **kwargs)
+    assert (S.m, S.n) == mn and S.grid.shape == (S.N, S.N)
+
+@pytest.mark.parametrize('args, kwargs', [
+    ((2,), {'m': 3}), (([0]*36, 3), {'m': 2}), ((1,2,3), {}), (([0]*81, [0]*81), {}),
+    (([0]*81,), {'grid': [0]*81}), (([0]*49,), {}), (([0]*80,), {}), ((), {}), ((6,), {})])
+def test_init_errors(args, kwargs):
+    with pytest.raises(ValueError):
+        Sudoku(*args, **kwargs)
+
+@pytest.mark.parametrize('N, mn', [(4,(2,2)), (6,(3,2)), (8,(4,2)), (9,(3,3)),
+                                   (12,(4,3)), (16,(4,4)), (25,(5,5))])
+def test_guess_block_shape(N, mn):
+    S = Sudoku([0]*N*N)
+    assert (S.m, S.n) == mn
+
+@pytest.mark.parametrize('N', [5, 7, 11])
+def test_guess_block_shape_prime(N):
+    with pytest.raises(ValueError):
+        Sudoku([0]*N*N)
+
+def test_solve_many_matches_solve():
+    bad = [0]*81 ; bad[1:9] = range(1,9) ; bad[45] = 9    # no value left for (0,0)
+    puzzles = [grid_of(EASY), grid_of(HARD), bad]
+    solved = Sudoku.solve_many(puzzles)
+    assert solved.shape == (3,9,9)
+    for puzzle, solution in zip(puzzles, solved):
+        S = Sudoku(puzzle) ; S.solve()
+        assert (solution == S.grid).all()
+    assert solved[2].ravel().tolist() == bad
+    six = Sudoku.solve_many(np.zeros((4,36), int), 2, 3)
+    assert six.shape == (4,6,6) and all(is_solution(Sudoku(g, 2, 3), g) for g in six)
+
+def test_solve_many_gpu_fallback():
+    # without a usable GPU, gpu=True must give the same results as the CPU path
+    puzzles = [grid_of(EASY), grid_of(HARD)]
+    assert (Sudoku.solve_many(puzzles, gpu=True) == Sudoku.solve_many(puzzles)).all()
+
+def test_solve_many_gpu_simulator():
+    # run the CUDA kernel in numba's simulator, in a fresh interpreter
+    pytest.importorskip('numba')
+    code = ("from sudoku import Sudoku\n"
+            "for puzzles in ([[0,0,3,4, 2,3,4,1, 0,2,0,0, 0,0,0,0], [0]*16],\n"
+            f"                [[int(c) for c in '{EASY}'], [int(c) for c in '{HARD}']]):\n"
+            "    assert (Sudoku.solve_many(puzzles, gpu=True) == Sudoku.solve_many(puzzles)).all()\n")
+    subprocess.run([sys.executable, '-c', code], check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)),
+                   env={**os.environ, 'NUMBA_ENABLE_CUDASIM': '1'})
+
+def test_solve_core_9x9_matches_generic():
+    A, B = Sudoku(grid_of(HARD)), Sudoku(grid_of(HARD))
+    assert _solve_core_9x9(A.grid.reshape(-1), A.row_mask, A.col_mask, A.box_mask)
+    assert _solve_core(B.grid.reshape(-1), B.row_mask, B.col_mask, B.box_mask, 3, 3)
+    assert (A.grid == B.grid).all() and (A.row_mask == B.row_mask).all()
+
+def test_int8_grid():
+    S = Sudoku(4)    # 16 x 16: the digits up to 16 must not overflow in the masks
+    assert S.grid.dtype == np.int8 and Sudoku([0]*81).grid.dtype == np.int8
+    assert S.solve() and is_solution(S, S.grid)
+    assert S.row_mask.tolist() == S.col_mask.tolist() == S.box_mask.tolist() == [0xFFFF]*16
+
+def test_pmask_broadcast():
+    S = Sudoku(grid_of(HARD))
+    assert S.pmask.dtype == np.uint32 and S.pmask.tolist() == [
+        0 if S.grid[i,j] else ~int(S.row_mask[i] | S.col_mask[j] | S.box_mask[S.box(i,j)]) & S.ALL
+        for i,j in S.all()]